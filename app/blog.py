@@ -1,13 +1,15 @@
 import boto3
 import json
 
-from fastapi import APIRouter, Form, File, UploadFile, HTTPException, Query, Depends
+from fastapi import APIRouter, BackgroundTasks, Form, File, UploadFile, HTTPException, Query, Depends
 from typing import Optional
 from io import BytesIO
 from math import ceil
+from datetime import datetime
 import uuid
 from concurrent.futures import ThreadPoolExecutor
 from app.auth import validate_token
+from app.snapshot import refresh_snapshot
 from app.utilities_S3 import download_object, get_s3_client, S3_BUCKET_NAME, S3_REGION
 
 s3 = get_s3_client()
@@ -15,6 +17,7 @@ blog_router = APIRouter()
 
 @blog_router.post("/add-blog", dependencies=[Depends(validate_token)])
 async def create_post(
+    background_tasks: BackgroundTasks,
     id: str = Form(...),
     title: str = Form(...),
     subtitle: str = Form(...),
@@ -26,6 +29,24 @@ async def create_post(
     image: Optional[UploadFile] = File(None),
 ):
     try:
+        s3_json_key = f"blogs/{id}.json"
+
+        # Keep the original dates when an existing post is re-saved. The publish date is set when the
+        # post first leaves draft and cleared while it is a draft; posts saved before these fields
+        # existed fall back to their last modification time.
+        now = datetime.utcnow().isoformat()
+        created_at = now
+        published_at = None if draft else now
+        try:
+            existing = s3.get_object(Bucket=S3_BUCKET_NAME, Key=s3_json_key)
+            existing_data = json.loads(existing['Body'].read().decode('utf-8'))
+            last_modified = existing['LastModified'].replace(tzinfo=None).isoformat()
+            created_at = existing_data.get("created_at", last_modified)
+            if not draft and not existing_data.get("draft", False):
+                published_at = existing_data.get("published_at") or last_modified
+        except s3.exceptions.NoSuchKey:
+            pass
+
         image_url = prev_image_url
         if image:
             print(f"Uploading image: {image.filename}")
@@ -52,9 +73,10 @@ async def create_post(
             "content": content,
             "draft": draft,
             "image_url": image_url,
+            "created_at": created_at,
+            "published_at": published_at,
         }
 
-        s3_json_key = f"blogs/{id}.json"
         json_data = json.dumps(blog_data, indent=4)
 
         s3.put_object(
@@ -65,6 +87,7 @@ async def create_post(
         )
         
         download_object(s3_json_key, True)
+        background_tasks.add_task(refresh_snapshot)
 
         return {"message": "Post created successfully", "post": blog_data}
 
@@ -168,7 +191,7 @@ async def get_blog(blog_id: str):
 
 # Endpoint to delete a Blog by ID
 @blog_router.delete("/blog/{blog_id}", dependencies=[Depends(validate_token)])
-async def delete_blog(blog_id: str):
+async def delete_blog(blog_id: str, background_tasks: BackgroundTasks):
     try:
         # Construct the S3 key using the Blog ID
         s3_json_key = f"blogs/{blog_id}.json"
@@ -181,6 +204,7 @@ async def delete_blog(blog_id: str):
 
         # Delete the Blog from S3
         s3.delete_object(Bucket=S3_BUCKET_NAME, Key=s3_json_key)
+        background_tasks.add_task(refresh_snapshot)
 
         return {"message": f"Blog with ID {blog_id} deleted successfully"}
 
@@ -1,10 +1,11 @@
 import boto3
 import json
 from concurrent.futures import ThreadPoolExecutor
-from fastapi import APIRouter, Form, HTTPException, Query, Depends
+from fastapi import APIRouter, BackgroundTasks, Form, HTTPException, Query, Depends
 from math import ceil
 from datetime import datetime
 from app.auth import validate_token
+from app.snapshot import refresh_snapshot
 from app.utilities_S3 import download_object, get_s3_client, S3_BUCKET_NAME, S3_REGION
 
 
@@ -14,6 +15,7 @@ s3 = get_s3_client()
 # Endpoint to create an FAQ
 @faq_router.post("/add-faq", dependencies=[Depends(validate_token)])
 async def create_faq(
+    background_tasks: BackgroundTasks,
     id: str = Form(...),
     title: str = Form(...),
     answer: str = Form(...),
@@ -39,6 +41,7 @@ async def create_faq(
             ContentType='application/json'
         )
         download_object(s3_json_key, True)	
+        background_tasks.add_task(refresh_snapshot)
         return {"message": "FAQ created successfully", "faq": faq_data}
 
     except Exception as e:
@@ -106,7 +109,7 @@ async def get_faq(faq_id: str):
 
 # Endpoint to delete an FAQ by ID
 @faq_router.delete("/faq/{faq_id}", dependencies=[Depends(validate_token)])
-async def delete_faq(faq_id: str):
+async def delete_faq(faq_id: str, background_tasks: BackgroundTasks):
     try:
         s3_json_key = f"faqs/{faq_id}.json"
         try:
@@ -115,6 +118,7 @@ async def delete_faq(faq_id: str):
             raise HTTPException(status_code=404, detail="FAQ not found")
 
         s3.delete_object(Bucket=S3_BUCKET_NAME, Key=s3_json_key)
+        background_tasks.add_task(refresh_snapshot)
 
         return {"message": f"FAQ with ID {faq_id} deleted successfully"}
 
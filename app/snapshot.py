@@ -0,0 +1,316 @@
+import os
+import json
+import hashlib
+import argparse
+import threading
+from math import ceil
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+from botocore.exceptions import ClientError
+from app.utilities_S3 import download_object, get_s3_client, S3_BUCKET_NAME
+
+# Static snapshot configuration
+SNAPSHOT_PREFIX = os.environ.get("SNAPSHOT_PREFIX", "static/")
+SNAPSHOT_BUCKET_NAME = os.environ.get("SNAPSHOT_BUCKET_NAME", S3_BUCKET_NAME)
+# The manifest lives outside the snapshot prefix so the CDN never serves it
+SNAPSHOT_MANIFEST_KEY = os.environ.get("SNAPSHOT_MANIFEST_KEY", "snapshot-manifest.json")
+SITE_URL = os.environ.get("SITE_URL", "https://www.tantunai.com")
+SNAPSHOT_PAGE_SIZE = 10
+FEED_ITEM_LIMIT = 20
+
+s3 = get_s3_client()
+
+# Serialises regenerations within this process; other processes are caught by the conditional manifest write
+_snapshot_lock = threading.Lock()
+
+
+class SnapshotStore:
+    """Writes snapshot objects under a prefix of an S3 bucket, or of a local directory if one is given.
+
+    Keys passed to write and delete are relative to the prefix; the manifest is stored at its own key.
+    """
+
+    def __init__(
+        self,
+        prefix: str = SNAPSHOT_PREFIX,
+        output_dir: Optional[str] = None,
+        bucket_name: str = SNAPSHOT_BUCKET_NAME,
+        manifest_key: str = SNAPSHOT_MANIFEST_KEY,
+    ):
+        self.prefix = prefix
+        self.output_dir = output_dir
+        self.bucket_name = bucket_name
+        self.manifest_key = manifest_key
+
+    def _path(self, full_key: str) -> str:
+        root = os.path.realpath(self.output_dir)
+        path = os.path.realpath(os.path.join(root, full_key))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f"Snapshot key {full_key} resolves outside {self.output_dir}")
+        return path
+
+    # Returns the manifest body with the ETag it was read at, for the conditional write in write_manifest
+    def read_manifest(self) -> Tuple[Optional[str], Optional[str]]:
+        try:
+            if self.output_dir:
+                with open(self._path(self.manifest_key), encoding="utf-8") as f:
+                    return f.read(), None
+            s3_object = s3.get_object(Bucket=self.bucket_name, Key=self.manifest_key)
+            return s3_object['Body'].read().decode('utf-8'), s3_object['ETag']
+        except (FileNotFoundError, s3.exceptions.NoSuchKey):
+            return None, None
+
+    # On S3 the write fails with PreconditionFailed if another writer replaced the manifest since it was read
+    def write_manifest(self, body: str, etag: Optional[str]):
+        if self.output_dir:
+            self._put(self.manifest_key, body, "application/json")
+            return
+        condition = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+        s3.put_object(
+            Bucket=self.bucket_name,
+            Key=self.manifest_key,
+            Body=body,
+            ContentType="application/json",
+            **condition,
+        )
+
+    def write(self, key: str, body: str, content_type: str):
+        self._put(self.prefix + key, body, content_type)
+
+    def _put(self, full_key: str, body: str, content_type: str):
+        if self.output_dir:
+            path = self._path(full_key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(body)
+            return
+        s3.put_object(
+            Bucket=self.bucket_name,
+            Key=full_key,
+            Body=body,
+            ContentType=content_type,
+        )
+
+    def delete(self, key: str):
+        if self.output_dir:
+            try:
+                os.remove(self._path(self.prefix + key))
+            except FileNotFoundError:
+                pass
+            return
+        s3.delete_object(Bucket=self.bucket_name, Key=self.prefix + key)
+
+
+# Load every object under a source prefix along with its S3 modification time
+def _load_published(source_prefix: str) -> list:
+    paginator = s3.get_paginator('list_objects_v2')
+    pages = paginator.paginate(Bucket=S3_BUCKET_NAME, Prefix=source_prefix)
+
+    files = []
+    for page_content in pages:
+        if 'Contents' in page_content:
+            files.extend([file for file in page_content['Contents'] if file['Key'].endswith('.json')])
+
+    with ThreadPoolExecutor() as executor:
+        results = list(executor.map(download_object, [file['Key'] for file in files]))
+
+    published = []
+    for file, data in zip(files, results):
+        if data.get('draft', False):
+            continue
+        # Ids come straight from form input and become object keys and file names, so each must be one path segment
+        item_id = str(data.get('id', ''))
+        if item_id in ("", ".", "..") or "/" in item_id or "\\" in item_id:
+            print(f"Skipping {file['Key']} in snapshot: unsafe id {item_id!r}")
+            continue
+        published.append((data, file['LastModified']))
+    return published
+
+
+# Listing pages shaped like the list endpoints' responses, including their empty response as page 1
+def _paginate(items: list, name: str, message: str, empty_message: str) -> list:
+    total = len(items)
+    if not total:
+        return [{"message": empty_message, f"total_{name}": 0, "total_pages": 0, name: []}]
+
+    total_pages = ceil(total / SNAPSHOT_PAGE_SIZE)
+    pages = []
+    for page in range(1, total_pages + 1):
+        start_index = (page - 1) * SNAPSHOT_PAGE_SIZE
+        pages.append({
+            "message": message,
+            f"total_{name}": total,
+            "total_pages": total_pages,
+            "current_page": page,
+            "page_size": SNAPSHOT_PAGE_SIZE,
+            name: items[start_index:start_index + SNAPSHOT_PAGE_SIZE],
+        })
+    return pages
+
+
+# Publish date of a post: its published_at field, or the S3 modification time for posts saved before it existed
+def _published_at(item: dict, last_modified: datetime) -> datetime:
+    try:
+        published = datetime.fromisoformat(item['published_at'])
+    except (KeyError, TypeError, ValueError):
+        return last_modified
+    return published if published.tzinfo else published.replace(tzinfo=timezone.utc)
+
+
+def _render_feed(posts: list) -> str:
+    newest_first = sorted(
+        ((post, _published_at(post, last_modified)) for post, last_modified in posts),
+        key=lambda entry: entry[1],
+        reverse=True,
+    )
+
+    items = []
+    for post, published_at in newest_first[:FEED_ITEM_LIMIT]:
+        link = f"{SITE_URL}/blog/{quote(post['id'], safe='')}"
+        items.append(
+            "<item>"
+            f"<title>{escape(post.get('title', ''))}</title>"
+            f"<link>{escape(link)}</link>"
+            f"<guid isPermaLink=\"true\">{escape(link)}</guid>"
+            f"<description>{escape(post.get('subtitle', ''))}</description>"
+            f"<dc:creator>{escape(post.get('author', ''))}</dc:creator>"
+            f"<pubDate>{format_datetime(published_at.astimezone(timezone.utc), usegmt=True)}</pubDate>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>'
+        "<title>Tantun AI Blog</title>"
+        f"<link>{escape(SITE_URL)}/blogs</link>"
+        "<description>Medicare news and guides from Tantun AI</description>"
+        + "".join(items)
+        + "</channel></rss>\n"
+    )
+
+
+def _render_sitemap(posts: list, faqs: list) -> str:
+    urls = [(f"{SITE_URL}/blogs", None), (f"{SITE_URL}/faqs", None)]
+    urls += [(f"{SITE_URL}/blog/{quote(post['id'], safe='')}", last_modified) for post, last_modified in posts]
+    urls += [(f"{SITE_URL}/faq/{quote(faq['id'], safe='')}", last_modified) for faq, last_modified in faqs]
+
+    entries = []
+    for loc, last_modified in urls:
+        lastmod = f"<lastmod>{last_modified.date().isoformat()}</lastmod>" if last_modified else ""
+        entries.append(f"<url><loc>{escape(loc)}</loc>{lastmod}</url>")
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + "".join(entries)
+        + "</urlset>\n"
+    )
+
+
+def _render_all(posts: list, faqs: list) -> dict:
+    documents = {}
+
+    post_pages = _paginate([post for post, _ in posts], "posts", "Posts retrieved successfully", "No posts found")
+    for number, page in enumerate(post_pages, start=1):
+        documents[f"blogs/page-{number}.json"] = (page, "application/json")
+    faq_pages = _paginate([faq for faq, _ in faqs], "faqs", "FAQs retrieved successfully", "No FAQs found")
+    for number, page in enumerate(faq_pages, start=1):
+        documents[f"faqs/page-{number}.json"] = (page, "application/json")
+
+    for post, _ in posts:
+        documents[f"blog/{post['id']}.json"] = ({"message": "Blog retrieved successfully", "blog": post}, "application/json")
+    for faq, _ in faqs:
+        documents[f"faq/{faq['id']}.json"] = ({"message": "FAQ retrieved successfully", "faq": faq}, "application/json")
+
+    documents["feed.xml"] = (_render_feed(posts), "application/rss+xml")
+    documents["sitemap.xml"] = (_render_sitemap(posts, faqs), "application/xml")
+
+    return {
+        key: (body if isinstance(body, str) else json.dumps(body, indent=4), content_type)
+        for key, (body, content_type) in documents.items()
+    }
+
+
+class _ManifestConflict(Exception):
+    """Raised when the conditional manifest write loses to another writer.
+
+    Carries every key the failed attempt knew about, so the retry can delete any it no longer renders.
+    """
+
+    def __init__(self, keys: set):
+        super().__init__("Snapshot manifest changed during regeneration")
+        self.keys = keys
+
+
+def _write_snapshot(store: SnapshotStore, full: bool, stale_candidates: frozenset = frozenset()) -> dict:
+    manifest_data, manifest_etag = store.read_manifest()
+    manifest = json.loads(manifest_data) if manifest_data else {}
+
+    documents = _render_all(_load_published("blogs/"), _load_published("faqs/"))
+
+    new_manifest = {}
+    written = []
+    for key, (body, content_type) in documents.items():
+        digest = hashlib.sha256(body.encode('utf-8')).hexdigest()
+        new_manifest[key] = digest
+        if full or manifest.get(key) != digest:
+            store.write(key, body, content_type)
+            written.append(key)
+
+    # Unpublished or deleted content, and listing pages that no longer exist
+    deleted = sorted(key for key in set(manifest) | stale_candidates if key not in new_manifest)
+    for key in deleted:
+        store.delete(key)
+
+    if written or deleted or manifest_data is None:
+        try:
+            store.write_manifest(json.dumps(new_manifest, indent=4), manifest_etag)
+        except ClientError as e:
+            if e.response['Error']['Code'] != "PreconditionFailed":
+                raise
+            raise _ManifestConflict(set(manifest) | set(written))
+
+    return {"written": written, "deleted": deleted}
+
+
+def regenerate_snapshot(store: Optional[SnapshotStore] = None, full: bool = False) -> dict:
+    """Render the snapshot and write only the objects whose content changed since the last run.
+
+    If another process (an API task or the CLI) replaced the manifest while this run was writing, the
+    objects may be a mix of both runs, so the run is repeated once rewriting every object and deleting
+    anything the first attempt wrote or tracked that is no longer rendered. Writes to a
+    local output directory are not conditional; after overlapping CLI runs there, use --full.
+    """
+    store = store or SnapshotStore()
+
+    with _snapshot_lock:
+        try:
+            result = _write_snapshot(store, full)
+        except _ManifestConflict as conflict:
+            print("Snapshot manifest changed during regeneration, rewriting every object")
+            result = _write_snapshot(store, True, frozenset(conflict.keys))
+
+    print(f"Snapshot regenerated: {len(result['written'])} written, {len(result['deleted'])} deleted")
+    return result
+
+
+# Background task entry point; failures must not affect the request that triggered it
+def refresh_snapshot():
+    try:
+        regenerate_snapshot()
+    except Exception as e:
+        print(f"Failed to regenerate snapshot: {str(e)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render published blogs and FAQs as static snapshot objects.")
+    parser.add_argument("--output-dir", help="Write to this local directory instead of S3")
+    parser.add_argument("--prefix", default=SNAPSHOT_PREFIX, help="Key prefix for snapshot objects")
+    parser.add_argument("--manifest-key", default=SNAPSHOT_MANIFEST_KEY, help="Key of the manifest, outside the prefix")
+    parser.add_argument("--full", action="store_true", help="Rewrite every object, ignoring the manifest")
+    args = parser.parse_args()
+
+    store = SnapshotStore(prefix=args.prefix, output_dir=args.output_dir, manifest_key=args.manifest_key)
+    regenerate_snapshot(store, full=args.full)
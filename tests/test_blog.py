@@ -0,0 +1,115 @@
+import json
+
+import boto3
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from moto import mock_aws
+
+from app import blog
+from app.auth import validate_token
+from app.utilities_S3 import S3_BUCKET_NAME
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=S3_BUCKET_NAME)
+        monkeypatch.setattr(blog, "s3", client)
+        # The Redis cache refresh is not under test
+        monkeypatch.setattr(blog, "download_object", lambda *args, **kwargs: None)
+        yield client
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    calls = []
+    monkeypatch.setattr(blog, "refresh_snapshot", lambda: calls.append(True))
+    return calls
+
+
+@pytest.fixture
+def api(s3_client, refreshes):
+    app = FastAPI()
+    app.include_router(blog.blog_router)
+    app.dependency_overrides[validate_token] = lambda: None
+    return TestClient(app)
+
+
+def save_post(api, draft):
+    response = api.post(
+        "/add-blog",
+        data={
+            "id": "post-1",
+            "title": "Title",
+            "subtitle": "Subtitle",
+            "author": "Jane Doe",
+            "tags": "Medicare,Plans",
+            "content": "Content",
+            "draft": str(draft).lower(),
+        },
+    )
+    assert response.status_code == 200
+    return response.json()["post"]
+
+
+def stored_post(s3_client):
+    return json.loads(s3_client.get_object(Bucket=S3_BUCKET_NAME, Key="blogs/post-1.json")["Body"].read())
+
+
+def test_new_post_gets_dates(api, s3_client):
+    post = save_post(api, draft=False)
+
+    assert post["created_at"]
+    assert post["published_at"] == post["created_at"]
+    assert stored_post(s3_client) == post
+
+
+def test_new_draft_has_no_publish_date(api):
+    post = save_post(api, draft=True)
+
+    assert post["created_at"]
+    assert post["published_at"] is None
+
+
+def test_resave_keeps_dates(api):
+    first = save_post(api, draft=False)
+    second = save_post(api, draft=False)
+
+    assert second["created_at"] == first["created_at"]
+    assert second["published_at"] == first["published_at"]
+
+
+def test_publishing_a_draft_sets_publish_date(api):
+    drafted = save_post(api, draft=True)
+    published = save_post(api, draft=False)
+    unpublished = save_post(api, draft=True)
+
+    assert published["created_at"] == drafted["created_at"]
+    assert published["published_at"] is not None
+    assert unpublished["published_at"] is None
+
+
+def test_legacy_post_falls_back_to_last_modified(api, s3_client):
+    s3_client.put_object(
+        Bucket=S3_BUCKET_NAME,
+        Key="blogs/post-1.json",
+        Body=json.dumps({"id": "post-1", "title": "Title", "draft": False}),
+    )
+    last_modified = s3_client.head_object(Bucket=S3_BUCKET_NAME, Key="blogs/post-1.json")["LastModified"]
+
+    post = save_post(api, draft=False)
+
+    assert post["created_at"] == last_modified.replace(tzinfo=None).isoformat()
+    assert post["published_at"] == post["created_at"]
+
+
+def test_create_and_delete_queue_snapshot_refresh(api, refreshes):
+    save_post(api, draft=False)
+    assert len(refreshes) == 1
+
+    response = api.delete("/blog/post-1")
+
+    assert response.status_code == 200
+    assert len(refreshes) == 2
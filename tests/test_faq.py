@@ -0,0 +1,42 @@
+import boto3
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from moto import mock_aws
+
+from app import faq
+from app.auth import validate_token
+from app.utilities_S3 import S3_BUCKET_NAME
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    calls = []
+    monkeypatch.setattr(faq, "refresh_snapshot", lambda: calls.append(True))
+    return calls
+
+
+@pytest.fixture
+def api(monkeypatch, refreshes):
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=S3_BUCKET_NAME)
+        monkeypatch.setattr(faq, "s3", client)
+        # The Redis cache refresh is not under test
+        monkeypatch.setattr(faq, "download_object", lambda *args, **kwargs: None)
+
+        app = FastAPI()
+        app.include_router(faq.faq_router)
+        app.dependency_overrides[validate_token] = lambda: None
+        yield TestClient(app)
+
+
+def test_create_and_delete_queue_snapshot_refresh(api, refreshes):
+    response = api.post("/add-faq", data={"id": "faq-1", "title": "Question", "answer": "Answer", "draft": "false"})
+    assert response.status_code == 200
+    assert len(refreshes) == 1
+
+    response = api.delete("/faq/faq-1")
+
+    assert response.status_code == 200
+    assert len(refreshes) == 2
@@ -0,0 +1,260 @@
+import json
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from app import snapshot
+from app.snapshot import SnapshotStore, regenerate_snapshot
+from app.utilities_S3 import S3_BUCKET_NAME
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=S3_BUCKET_NAME)
+        monkeypatch.setattr(snapshot, "s3", client)
+        # Bypass the Redis cache and read source documents straight from the mocked bucket
+        monkeypatch.setattr(
+            snapshot,
+            "download_object",
+            lambda key: json.loads(client.get_object(Bucket=S3_BUCKET_NAME, Key=key)["Body"].read()),
+        )
+        yield client
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(output_dir=str(tmp_path))
+
+
+def put_post(client, post_id, draft=False, title=None, published_at="2026-01-01T00:00:00"):
+    post = {
+        "id": post_id,
+        "title": title or f"Title {post_id}",
+        "subtitle": "Subtitle",
+        "author": "Jane Doe",
+        "tags": ["Medicare"],
+        "content": "Content",
+        "draft": draft,
+        "image_url": None,
+        "created_at": "2026-01-01T00:00:00",
+        "published_at": None if draft else published_at,
+    }
+    client.put_object(Bucket=S3_BUCKET_NAME, Key=f"blogs/{post_id}.json", Body=json.dumps(post))
+
+
+def put_faq(client, faq_id, draft=False):
+    faq = {"id": faq_id, "title": "Question", "answer": "Answer", "draft": draft, "created_at": "2026-01-01T00:00:00"}
+    client.put_object(Bucket=S3_BUCKET_NAME, Key=f"faqs/{faq_id}.json", Body=json.dumps(faq))
+
+
+def read_json(tmp_path, key):
+    with open(tmp_path / "static" / key) as f:
+        return json.load(f)
+
+
+def test_first_run_writes_every_published_object(s3_client, store, tmp_path):
+    put_post(s3_client, "post-1")
+    put_post(s3_client, "post-2")
+    put_post(s3_client, "post-3", draft=True)
+    put_faq(s3_client, "faq-1")
+
+    result = regenerate_snapshot(store)
+
+    assert sorted(result["written"]) == [
+        "blog/post-1.json",
+        "blog/post-2.json",
+        "blogs/page-1.json",
+        "faq/faq-1.json",
+        "faqs/page-1.json",
+        "feed.xml",
+        "sitemap.xml",
+    ]
+    assert result["deleted"] == []
+    assert not os.path.exists(tmp_path / "static" / "blog" / "post-3.json")
+    assert [post["id"] for post in read_json(tmp_path, "blogs/page-1.json")["posts"]] == ["post-1", "post-2"]
+    assert "post-3" not in (tmp_path / "static" / "feed.xml").read_text()
+    # The manifest is kept outside the public prefix
+    assert os.path.exists(tmp_path / "snapshot-manifest.json")
+    assert not os.path.exists(tmp_path / "static" / "snapshot-manifest.json")
+
+
+def test_second_run_without_changes_writes_nothing(s3_client, store):
+    put_post(s3_client, "post-1")
+    put_faq(s3_client, "faq-1")
+    regenerate_snapshot(store)
+
+    assert regenerate_snapshot(store) == {"written": [], "deleted": []}
+
+
+def test_publishing_a_draft_rewrites_only_affected_objects(s3_client, store, tmp_path):
+    put_post(s3_client, "post-1")
+    put_post(s3_client, "post-2", draft=True)
+    put_faq(s3_client, "faq-1")
+    regenerate_snapshot(store)
+
+    put_post(s3_client, "post-2")
+    result = regenerate_snapshot(store)
+
+    assert sorted(result["written"]) == ["blog/post-2.json", "blogs/page-1.json", "feed.xml", "sitemap.xml"]
+    assert result["deleted"] == []
+    assert read_json(tmp_path, "blog/post-2.json")["blog"]["id"] == "post-2"
+
+
+def test_editing_a_post_rewrites_only_its_listing_page(s3_client, store):
+    for number in range(11):
+        put_post(s3_client, f"post-{number:02d}")
+    regenerate_snapshot(store)
+
+    put_post(s3_client, "post-10", title="Updated title")
+    result = regenerate_snapshot(store)
+
+    assert sorted(result["written"]) == ["blog/post-10.json", "blogs/page-2.json", "feed.xml"]
+    assert result["deleted"] == []
+
+
+def test_deleting_a_post_removes_its_document_and_trailing_page(s3_client, store, tmp_path):
+    for number in range(11):
+        put_post(s3_client, f"post-{number:02d}")
+    regenerate_snapshot(store)
+
+    s3_client.delete_object(Bucket=S3_BUCKET_NAME, Key="blogs/post-05.json")
+    result = regenerate_snapshot(store)
+
+    assert sorted(result["written"]) == ["blogs/page-1.json", "feed.xml", "sitemap.xml"]
+    assert sorted(result["deleted"]) == ["blog/post-05.json", "blogs/page-2.json"]
+    assert not os.path.exists(tmp_path / "static" / "blog" / "post-05.json")
+    assert not os.path.exists(tmp_path / "static" / "blogs" / "page-2.json")
+    assert read_json(tmp_path, "blogs/page-1.json")["total_pages"] == 1
+
+
+def test_unpublishing_a_post_removes_its_document(s3_client, store):
+    put_post(s3_client, "post-1")
+    put_post(s3_client, "post-2")
+    regenerate_snapshot(store)
+
+    put_post(s3_client, "post-2", draft=True)
+    result = regenerate_snapshot(store)
+
+    assert result["deleted"] == ["blog/post-2.json"]
+
+
+def test_full_run_rewrites_everything(s3_client, store, tmp_path):
+    put_post(s3_client, "post-1")
+    put_faq(s3_client, "faq-1")
+    regenerate_snapshot(store)
+
+    result = regenerate_snapshot(store, full=True)
+
+    manifest = json.loads((tmp_path / "snapshot-manifest.json").read_text())
+    assert sorted(result["written"]) == sorted(manifest)
+
+
+def test_empty_listing_matches_list_endpoint(s3_client, store, tmp_path):
+    put_post(s3_client, "post-1", draft=True)
+
+    regenerate_snapshot(store)
+
+    assert read_json(tmp_path, "blogs/page-1.json") == {
+        "message": "No posts found",
+        "total_posts": 0,
+        "total_pages": 0,
+        "posts": [],
+    }
+    assert read_json(tmp_path, "faqs/page-1.json")["message"] == "No FAQs found"
+
+
+def test_feed_lists_newest_posts_first(s3_client, store, tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "FEED_ITEM_LIMIT", 2)
+    put_post(s3_client, "post-1", published_at="2026-03-01T00:00:00")
+    put_post(s3_client, "post-2", published_at="2026-01-01T00:00:00")
+    put_post(s3_client, "post-10", published_at="2026-02-01T00:00:00")
+
+    regenerate_snapshot(store)
+
+    feed = (tmp_path / "static" / "feed.xml").read_text()
+    assert feed.index("/blog/post-1<") < feed.index("/blog/post-10<")
+    assert "/blog/post-2<" not in feed
+    assert "<dc:creator>Jane Doe</dc:creator>" in feed
+
+
+def test_unsafe_ids_are_skipped(s3_client, store, tmp_path):
+    put_post(s3_client, "post-1")
+    s3_client.put_object(
+        Bucket=S3_BUCKET_NAME,
+        Key="blogs/escape.json",
+        Body=json.dumps({"id": "../../escape", "title": "Escape", "draft": False}),
+    )
+
+    result = regenerate_snapshot(store)
+
+    assert not any("escape" in key for key in result["written"])
+    assert not os.path.exists(tmp_path / "escape.json")
+
+
+def test_ids_are_encoded_in_urls(s3_client, store, tmp_path):
+    put_post(s3_client, "part-1..2")
+    put_post(s3_client, "what is Medicare? #1 ü")
+
+    result = regenerate_snapshot(store)
+
+    assert "blog/part-1..2.json" in result["written"]
+    feed = (tmp_path / "static" / "feed.xml").read_text()
+    sitemap = (tmp_path / "static" / "sitemap.xml").read_text()
+    encoded = "https://www.tantunai.com/blog/what%20is%20Medicare%3F%20%231%20%C3%BC"
+    assert f"<link>{encoded}</link>" in feed
+    assert f"<loc>{encoded}</loc>" in sitemap
+    assert "<loc>https://www.tantunai.com/blog/part-1..2</loc>" in sitemap
+
+
+def test_concurrent_manifest_change_triggers_full_rewrite(s3_client):
+    store = SnapshotStore()
+    put_post(s3_client, "post-1")
+    regenerate_snapshot(store)
+    put_post(s3_client, "post-2")
+
+    read_manifest = store.read_manifest
+
+    # Another writer replaces the manifest between this run reading and writing it
+    def read_then_race():
+        store.read_manifest = read_manifest
+        manifest = read_manifest()
+        s3_client.put_object(Bucket=S3_BUCKET_NAME, Key=store.manifest_key, Body="{}")
+        return manifest
+
+    store.read_manifest = read_then_race
+    result = regenerate_snapshot(store)
+
+    manifest = json.loads(s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=store.manifest_key)["Body"].read())
+    assert "blog/post-2.json" in manifest
+    assert sorted(result["written"]) == sorted(manifest)
+
+
+def test_concurrent_manifest_change_deletes_post_removed_by_other_writer(s3_client, monkeypatch):
+    store = SnapshotStore()
+    put_post(s3_client, "post-1")
+    put_post(s3_client, "x")
+    regenerate_snapshot(store)
+    put_post(s3_client, "x", title="Edited")
+
+    render_all = snapshot._render_all
+
+    # After this run has loaded the sources (still including x), another writer handles the delete of x
+    def render_then_race(posts, faqs):
+        monkeypatch.setattr(snapshot, "_render_all", render_all)
+        documents = render_all(posts, faqs)
+        s3_client.delete_object(Bucket=S3_BUCKET_NAME, Key="blogs/x.json")
+        snapshot._write_snapshot(SnapshotStore(), False)
+        return documents
+
+    monkeypatch.setattr(snapshot, "_render_all", render_then_race)
+    result = regenerate_snapshot(store)
+
+    keys = [obj["Key"] for obj in s3_client.list_objects_v2(Bucket=S3_BUCKET_NAME, Prefix="static/")["Contents"]]
+    manifest = json.loads(s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=store.manifest_key)["Body"].read())
+    assert "static/blog/x.json" not in keys
+    assert "blog/x.json" not in manifest
+    assert "blog/x.json" in result["deleted"]